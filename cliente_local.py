@@ -0,0 +1,474 @@
+"""
+Cliente Supabase local (pruebas sin conexión).
+
+Sustituto en memoria del cliente de supabase-py: implementa el subconjunto del
+constructor de consultas que usa app.py, guarda cada tabla como un DataFrame
+(aguanta millones de filas sintéticas) y puede simular la latencia de cada viaje
+de ida y vuelta para reproducir lentitudes en una sola máquina.
+"""
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+TABLA_PACIENTES = "alertas_hemoglobina"
+
+# Clave primaria de cada tabla (conflictos de insert/upsert)
+CLAVES_LOCALES = {
+    TABLA_PACIENTES: "dni",
+    "citas": "id",
+    "seguimientos": "id",
+    "altitud_regiones": "region"
+}
+
+# Filas máximas por respuesta (max_rows por defecto de Supabase)
+TAMANO_PAGINA_SERVIDOR = 1000
+
+# Tablas con id autoincremental y created_at por defecto
+TABLAS_CON_ID_LOCAL = {"citas", "seguimientos"}
+
+# Recursos embebidos: (tabla, embebida) -> (columna en tabla, columna en embebida)
+RELACIONES_LOCALES = {
+    ("citas", TABLA_PACIENTES): ("dni_paciente", "dni"),
+    ("seguimientos", TABLA_PACIENTES): ("dni_paciente", "dni")
+}
+
+OPERADORES_LOCALES = {
+    "eq": lambda serie, valor: serie == valor,
+    "neq": lambda serie, valor: serie != valor,
+    "lt": lambda serie, valor: serie < valor,
+    "lte": lambda serie, valor: serie <= valor,
+    "gt": lambda serie, valor: serie > valor,
+    "gte": lambda serie, valor: serie >= valor,
+}
+
+class ErrorSupabaseLocal(Exception):
+    """Error equivalente al APIError de PostgREST"""
+
+class RespuestaLocal:
+    """Misma forma que la respuesta de supabase-py (data y count)"""
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+# Operadores de un or_ de PostgREST ("columna.operador.valor") -> filtro del cliente
+OPERADORES_OR = {"eq": "eq", "neq": "neq", "lt": "lt", "lte": "lte", "gt": "gt", "gte": "gte", "in": "in_", "is": "eq"}
+
+def partir_por_comas(texto):
+    """Parte en las comas de primer nivel: las de dentro de paréntesis (in.(a,b), tabla(cols)) no cortan"""
+    partes, actual, nivel = [], "", 0
+    for caracter in texto:
+        if caracter == "," and nivel == 0:
+            partes.append(actual.strip())
+            actual = ""
+            continue
+        nivel += {"(": 1, ")": -1}.get(caracter, 0)
+        actual += caracter
+    partes.append(actual.strip())
+    return [parte for parte in partes if parte]
+
+def separar_columnas_select(columnas):
+    """Divide un select de PostgREST en columnas simples y recursos embebidos tabla(cols)"""
+    simples, embebidos = [], []
+    for parte in partir_por_comas(columnas):
+        if "(" in parte:
+            nombre, internas = parte[:-1].split("(", 1)
+            nombre, _, modificador = nombre.strip().partition("!")
+            embebidos.append((nombre, internas, modificador == "inner"))
+        else:
+            simples.append(parte)
+    return simples, embebidos
+
+def valor_local(serie, valor):
+    """Convierte el valor de un filtro (a menudo texto, como en la URL) al tipo de la columna"""
+    if isinstance(valor, str):
+        if valor in ("true", "false"):
+            return valor == "true"
+        if valor == "null":
+            return None
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            try:
+                return float(valor)
+            except ValueError:
+                return valor
+    return valor
+
+def mascara_filtro(df, operador, *argumentos):
+    """Máscara booleana de un filtro (operador, *argumentos) con la semántica de PostgREST"""
+    if operador == "or_":
+        mascara = pd.Series(False, index=df.index)
+        for condicion in partir_por_comas(argumentos[0]):
+            columna, operador_or, valor = condicion.split(".", 2)
+            if operador_or not in OPERADORES_OR:
+                raise ErrorSupabaseLocal(f"operador no soportado en or: {operador_or}")
+            if operador_or == "in":
+                valor = [v.strip().strip('"') for v in partir_por_comas(valor.strip()[1:-1])]
+            mascara |= mascara_filtro(df, OPERADORES_OR[operador_or], columna, valor)
+        return mascara
+
+    columna, valor = argumentos
+    if columna not in df.columns:
+        raise ErrorSupabaseLocal(f"column {columna} does not exist")
+    serie = df[columna]
+    if operador == "in_":
+        return serie.isin([valor_local(serie, v) for v in valor])
+    # Las categorías (compactar_tipos) no admiten <, >=...: se comparan como objetos
+    if isinstance(serie.dtype, pd.CategoricalDtype) and operador not in ("eq", "neq"):
+        serie = serie.astype(object)
+    valor = valor_local(serie, valor)
+    if valor is None:
+        return serie.isna() if operador == "eq" else serie.notna()
+    return OPERADORES_LOCALES[operador](serie, valor).fillna(False).astype(bool)
+
+def filtrar_df(df, filtros):
+    """Máscara que combina (AND) una lista de filtros como los de aplicar_filtros"""
+    mascara = pd.Series(True, index=df.index)
+    for operador, *argumentos in (filtros or []):
+        mascara &= mascara_filtro(df, operador, *argumentos)
+    return mascara
+
+def a_registros(df):
+    """DataFrame -> lista de dict con None en lugar de NaN (como el JSON de PostgREST)"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+class ConsultaLocal:
+    """Constructor de consultas encadenable sobre una tabla del almacén local"""
+
+    def __init__(self, cliente, tabla):
+        self.cliente = cliente
+        self.tabla = tabla
+        self.operacion = "select"
+        self.columnas = "*"
+        self.contar = None
+        self.solo_cabecera = False
+        self.valores = None
+        self.on_conflict = None
+        self.ignorar_duplicados = False
+        self.filtros = []
+        self.orden = []
+        self.limite = None
+        self.desde = 0
+
+    # ----- operaciones -----
+    def select(self, columnas="*", count=None, head=False):
+        self.columnas, self.contar, self.solo_cabecera = columnas, count, head
+        return self
+
+    def insert(self, valores):
+        self.operacion, self.valores = "insert", valores
+        return self
+
+    def upsert(self, valores, on_conflict=None, ignore_duplicates=False):
+        self.operacion, self.valores = "upsert", valores
+        self.on_conflict, self.ignorar_duplicados = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, valores):
+        self.operacion, self.valores = "update", valores
+        return self
+
+    def delete(self):
+        self.operacion = "delete"
+        return self
+
+    # ----- filtros y modificadores -----
+    def _filtro(self, operador, *argumentos):
+        self.filtros.append((operador, *argumentos))
+        return self
+
+    def eq(self, columna, valor):
+        return self._filtro("eq", columna, valor)
+
+    def neq(self, columna, valor):
+        return self._filtro("neq", columna, valor)
+
+    def lt(self, columna, valor):
+        return self._filtro("lt", columna, valor)
+
+    def lte(self, columna, valor):
+        return self._filtro("lte", columna, valor)
+
+    def gt(self, columna, valor):
+        return self._filtro("gt", columna, valor)
+
+    def gte(self, columna, valor):
+        return self._filtro("gte", columna, valor)
+
+    def in_(self, columna, valores):
+        return self._filtro("in_", columna, list(valores))
+
+    def or_(self, condiciones):
+        return self._filtro("or_", condiciones)
+
+    def order(self, columna, desc=False):
+        self.orden.append((columna, desc))
+        return self
+
+    def limit(self, cantidad):
+        self.limite = cantidad
+        return self
+
+    def range(self, inicio, fin):
+        self.desde, self.limite = inicio, fin - inicio + 1
+        return self
+
+    # ----- evaluación -----
+    def _embeber(self, df, registros, embebidos, filtros_embebidos):
+        """Agrega a cada registro los recursos embebidos (relación muchos a uno)"""
+        if not registros:
+            return registros
+        conservar = [True] * len(registros)
+        for nombre, internas, interno in embebidos:
+            columna, columna_destino = RELACIONES_LOCALES[(self.tabla, nombre)]
+            destino = self.cliente.tabla_df(nombre)
+            claves = df[columna].astype(str)
+            if not destino.empty:
+                destino = destino[destino[columna_destino].astype(str).isin(claves)]
+            filtros = [(o, c.split(".", 1)[1], v) for o, c, v in filtros_embebidos if c.startswith(nombre + ".")]
+            if filtros and not destino.empty:
+                destino = destino[filtrar_df(destino, filtros)]
+            claves_destino = destino[columna_destino].astype(str) if not destino.empty else []
+            if internas.strip() != "*":
+                destino = destino.reindex(columns=[c.strip() for c in internas.split(",")])
+            por_clave = dict(zip(claves_destino, a_registros(destino)))
+            for i, (registro, clave) in enumerate(zip(registros, claves)):
+                registro[nombre] = por_clave.get(clave)
+                if interno and registro[nombre] is None:
+                    conservar[i] = False
+        return [r for r, c in zip(registros, conservar) if c]
+
+    def _leer(self, df):
+        simples, embebidos = separar_columnas_select(self.columnas)
+        # Un filtro "tabla.columna" se aplica al recurso embebido, no a la tabla principal
+        filtros_embebidos = [f for f in self.filtros if f[0] != "or_" and "." in f[1]]
+        filtros_propios = [f for f in self.filtros if f not in filtros_embebidos]
+
+        if not df.empty:
+            df = df[filtrar_df(df, filtros_propios)]
+        total = len(df)
+
+        if self.orden and not df.empty:
+            df = df.sort_values(
+                [c for c, _ in self.orden],
+                ascending=[not d for _, d in self.orden],
+                kind="stable"
+            )
+        # Como PostgREST (max_rows), ninguna respuesta trae más de max_filas filas
+        limite = min(self.limite if self.limite is not None else self.cliente.max_filas, self.cliente.max_filas)
+        fin = self.desde + limite
+        df = df.iloc[self.desde:fin]
+
+        if self.solo_cabecera:
+            return [], total
+        if simples == ["count"] and not embebidos:
+            return [{"count": total}], total
+
+        if simples != ["*"]:
+            proyectado = df.reindex(columns=simples)
+        else:
+            proyectado = df
+        registros = a_registros(proyectado)
+        if embebidos:
+            registros = self._embeber(df, registros, embebidos, filtros_embebidos)
+        return registros, total
+
+    def execute(self):
+        cliente = self.cliente
+        with cliente.lock:
+            df = cliente.tabla_df(self.tabla)
+            if self.operacion == "select":
+                data, total = self._leer(df)
+            elif self.operacion in ("insert", "upsert"):
+                data, total = cliente.escribir(self.tabla, self.valores, self.operacion == "upsert",
+                                               self.on_conflict, self.ignorar_duplicados), None
+            elif df.empty:
+                data, total = [], None
+            else:
+                mascara = filtrar_df(df, self.filtros)
+                if self.operacion == "update":
+                    for columna, valor in self.valores.items():
+                        df.loc[mascara, columna] = valor
+                    df.loc[mascara, "updated_at"] = datetime.now().isoformat()
+                    data = a_registros(df[mascara])
+                else:
+                    data = a_registros(df[mascara])
+                    cliente.tablas[self.tabla] = df[~mascara]
+                total = None
+        cliente.esperar(len(data))
+        return RespuestaLocal(data, total if self.contar else None)
+
+class LlamadaRpcLocal:
+    def __init__(self, cliente, nombre, parametros):
+        self.cliente, self.nombre, self.parametros = cliente, nombre, parametros or {}
+
+    def execute(self):
+        funciones = self.cliente.funciones_rpc
+        if self.nombre not in funciones:
+            raise ErrorSupabaseLocal(f"Could not find the function public.{self.nombre}")
+        with self.cliente.lock:
+            data = funciones[self.nombre](self.cliente, self.parametros)
+        self.cliente.esperar(len(data))
+        return RespuestaLocal(data)
+
+class ClienteSupabaseLocal:
+    """
+    Cliente en memoria compatible con las llamadas de supabase-py que hace la app.
+    latencia: segundos fijos por viaje; variacion: extra aleatorio uniforme;
+    latencia_por_fila: costo de transferencia por fila devuelta;
+    funciones_rpc: nombre -> función(cliente, parámetros) que devuelve las filas.
+    """
+
+    def __init__(self, latencia=0.0, variacion=0.0, latencia_por_fila=0.0, max_filas=TAMANO_PAGINA_SERVIDOR,
+                 funciones_rpc=None):
+        self.tablas = {}
+        self.funciones_rpc = dict(funciones_rpc or {})
+        self.max_filas = max_filas
+        self.siguiente_id = {}
+        self.lock = threading.RLock()
+        self.latencia = latencia
+        self.variacion = variacion
+        self.latencia_por_fila = latencia_por_fila
+        self.viajes = 0
+
+    def table(self, nombre):
+        return ConsultaLocal(self, nombre)
+
+    def rpc(self, nombre, params=None):
+        return LlamadaRpcLocal(self, nombre, params)
+
+    def tabla_df(self, nombre):
+        return self.tablas.setdefault(nombre, pd.DataFrame())
+
+    def cargar(self, nombre, filas):
+        """Reemplaza el contenido de una tabla (lista de dict o DataFrame)"""
+        df = filas.copy() if isinstance(filas, pd.DataFrame) else pd.DataFrame(filas)
+        if not df.empty and "updated_at" not in df.columns:
+            df["updated_at"] = datetime.now().isoformat()
+        with self.lock:
+            self.tablas[nombre] = df.reset_index(drop=True)
+            if nombre in TABLAS_CON_ID_LOCAL and "id" in df.columns and not df.empty:
+                self.siguiente_id[nombre] = int(df["id"].max()) + 1
+
+    def esperar(self, filas):
+        self.viajes += 1
+        demora = self.latencia + self.latencia_por_fila * filas
+        if self.variacion:
+            demora += np.random.uniform(0, self.variacion)
+        if demora > 0:
+            time.sleep(demora)
+
+    def escribir(self, tabla, valores, es_upsert, on_conflict, ignorar_duplicados):
+        """Insert/upsert atómico: si una fila viola la clave, no se escribe ninguna"""
+        filas = [dict(v) for v in (valores if isinstance(valores, list) else [valores])]
+        df = self.tabla_df(tabla)
+        clave = on_conflict or CLAVES_LOCALES.get(tabla)
+        ahora = datetime.now().isoformat()
+        # Como el default y el trigger de SQL_COLUMNAS_MARCA_AGUA
+        for fila in filas:
+            fila["updated_at"] = ahora
+
+        if tabla in TABLAS_CON_ID_LOCAL:
+            for fila in filas:
+                if fila.get("id") is None:
+                    fila["id"] = self.siguiente_id.get(tabla, 1)
+                    self.siguiente_id[tabla] = fila["id"] + 1
+                fila.setdefault("created_at", ahora)
+
+        nuevas, actualizadas = filas, []
+        if clave:
+            existentes = set(df[clave].astype(str)) if clave in df.columns else set()
+            vistas = set()
+            nuevas = []
+            for fila in filas:
+                valor = str(fila.get(clave))
+                if valor in existentes or valor in vistas:
+                    if not es_upsert:
+                        raise ErrorSupabaseLocal(
+                            f'duplicate key value violates unique constraint "{tabla}_pkey" '
+                            f'(Key ({clave})=({valor}) already exists.)'
+                        )
+                    if not ignorar_duplicados and valor in existentes:
+                        actualizadas.append(fila)
+                    continue
+                vistas.add(valor)
+                nuevas.append(fila)
+
+        for fila in actualizadas:
+            mascara = df[clave].astype(str) == str(fila[clave])
+            for columna, valor in fila.items():
+                df.loc[mascara, columna] = valor
+        if nuevas:
+            df = pd.concat([df, pd.DataFrame(nuevas)], ignore_index=True)
+        self.tablas[tabla] = df
+        return nuevas + actualizadas
+
+REGIONES_SINTETICAS = [
+    "AMAZONAS", "ANCASH", "APURIMAC", "AREQUIPA", "AYACUCHO", "CAJAMARCA", "CALLAO",
+    "CUSCO", "HUANCAVELICA", "HUANUCO", "ICA", "JUNIN", "LA LIBERTAD", "LAMBAYEQUE",
+    "LIMA", "LORETO", "MADRE DE DIOS", "MOQUEGUA", "PASCO", "PIURA", "PUNO",
+    "SAN MARTIN", "TACNA", "TUMBES", "UCAYALI"
+]
+
+def generar_pacientes_sinteticos(cantidad, semilla=0):
+    """DataFrame de pacientes ficticios (vectorizado: sirve para millones de filas)"""
+    rng = np.random.default_rng(semilla)
+    hoy = np.datetime64(datetime.now().date())
+    dni = (10_000_000 + np.arange(cantidad)).astype(str)
+    region = rng.choice(REGIONES_SINTETICAS, cantidad)
+    altitud = rng.integers(0, 4500, cantidad)
+    hemoglobina = rng.normal(11.2, 1.6, cantidad).clip(4.0, 17.0).round(1)
+    ajuste = np.interp(altitud, [0, 1000, 2000, 3000, 4000, 5000], [0, 0, 0.5, 1.3, 2.5, 3.6])
+    edad = rng.integers(1, 216, cantidad)
+    riesgo = np.where(hemoglobina < 7, "ALTO RIESGO", np.where(hemoglobina < 10, "RIESGO MODERADO", "BAJO RIESGO"))
+
+    return pd.DataFrame({
+        "dni": dni,
+        "nombre_apellido": np.char.add("Paciente ", dni),
+        "edad_meses": edad,
+        "genero": rng.choice(["F", "M"], cantidad),
+        "telefono": np.char.add("9", rng.integers(10_000_000, 99_999_999, cantidad).astype(str)),
+        "region": region,
+        "departamento": region,
+        "altitud_msnm": altitud,
+        "hemoglobina_dl1": hemoglobina,
+        "hemoglobina_ajustada": (hemoglobina - ajuste).round(1),
+        "peso_kg": (3.5 + edad * 0.18 + rng.normal(0, 1.5, cantidad)).clip(2.0, None).round(1),
+        "talla_cm": (50 + edad * 0.55 + rng.normal(0, 3, cantidad)).round(1),
+        "en_seguimiento": hemoglobina < 10,
+        "riesgo": riesgo,
+        "estado_paciente": rng.choice(["Activo", "Inactivo"], cantidad, p=[0.9, 0.1]),
+        "tipo_suplemento_hierro": rng.choice(["Sulfato ferroso", "Hierro polimaltosado", "Ninguno"], cantidad),
+        "frecuencia_suplemento": rng.choice(["Diario", "Semanal"], cantidad),
+        "fecha_alerta": (hoy - rng.integers(0, 365, cantidad)).astype(str)
+    })
+
+def generar_citas_sinteticas(pacientes, fraccion=0.3, semilla=0):
+    """Una cita (pasada o próxima) para una fracción de los pacientes"""
+    rng = np.random.default_rng(semilla)
+    muestra = pacientes.sample(frac=fraccion, random_state=semilla)
+    hoy = np.datetime64(datetime.now().date())
+    fechas = hoy + rng.integers(-180, 60, len(muestra))
+    return pd.DataFrame({
+        "id": np.arange(1, len(muestra) + 1),
+        "dni_paciente": muestra["dni"].to_numpy(),
+        "fecha_cita": fechas.astype(str),
+        "hora_cita": "09:00",
+        "tipo_consulta": "Control",
+        "diagnostico": "Seguimiento de anemia",
+        "tratamiento": "",
+        "observaciones": "Cita sintética",
+        "investigador_responsable": "Sistema",
+        "proxima_cita": (fechas + 90).astype(str),
+        "created_at": datetime.now().isoformat()
+    })
+
+def crear_cliente_local(pacientes=5000, latencia_ms=0, semilla=0, funciones_rpc=None):
+    """Cliente local precargado con pacientes y citas sintéticos"""
+    cliente = ClienteSupabaseLocal(latencia=latencia_ms / 1000, funciones_rpc=funciones_rpc)
+    df_pacientes = generar_pacientes_sinteticos(pacientes, semilla)
+    cliente.cargar(TABLA_PACIENTES, df_pacientes)
+    cliente.cargar("citas", generar_citas_sinteticas(df_pacientes, semilla=semilla))
+    cliente.cargar("seguimientos", pd.DataFrame())
+    return cliente
@@ -0,0 +1,54 @@
+"""
+app.py es un script de Streamlit: importarlo abre la interfaz. Las pruebas cargan
+solo las funciones y tablas que necesitan, tomadas del árbol sintáctico del archivo.
+"""
+import ast
+import bisect
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from cliente_local import a_registros, filtrar_df  # noqa: E402  (app.py los importa de ahí)
+
+try:
+    # Como en app.py: sin supabase-py la clasificación de errores usa solo los tipos de Python
+    import httpx
+    from postgrest.exceptions import APIError
+except ImportError:
+    httpx = APIError = None
+
+ARBOL_APP = ast.parse((RAIZ / "app.py").read_text(encoding="utf-8"))
+
+class StreamlitMinimo:
+    """Lo que usan las funciones cargadas: cache_resource como decorador neutro"""
+    @staticmethod
+    def cache_resource(funcion):
+        return funcion
+
+def _nombres_definidos(nodo):
+    if isinstance(nodo, (ast.FunctionDef, ast.ClassDef)):
+        return {nodo.name}
+    if isinstance(nodo, ast.Assign):
+        return {objetivo.id for objetivo in nodo.targets if isinstance(objetivo, ast.Name)}
+    return set()
+
+def cargar_de_app(nombres, **globales):
+    """Ejecuta, en orden de aparición, las definiciones de app.py con esos nombres"""
+    espacio = {
+        "np": np, "pd": pd, "bisect": bisect, "threading": threading, "st": StreamlitMinimo,
+        "a_registros": a_registros, "filtrar_df": filtrar_df, "httpx": httpx, "APIError": APIError, **globales
+    }
+    nodos = [nodo for nodo in ARBOL_APP.body if _nombres_definidos(nodo) & set(nombres)]
+    exec(compile(ast.Module(body=nodos, type_ignores=[]), "app.py", "exec"), espacio)
+    return espacio
+
+@pytest.fixture
+def app():
+    return cargar_de_app
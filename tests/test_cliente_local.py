@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from cliente_local import ClienteSupabaseLocal, ErrorSupabaseLocal, crear_cliente_local
+
+PACIENTES = [
+    {"dni": "1", "region": "LIMA", "hemoglobina_dl1": 12.0, "en_seguimiento": False},
+    {"dni": "2", "region": "PUNO", "hemoglobina_dl1": 9.5, "en_seguimiento": True},
+    {"dni": "3", "region": "CUSCO", "hemoglobina_dl1": 10.9, "en_seguimiento": False},
+    {"dni": "4", "region": "LIMA", "hemoglobina_dl1": 6.8, "en_seguimiento": True},
+    {"dni": "5", "region": "TACNA", "hemoglobina_dl1": 11.0, "en_seguimiento": False},
+]
+
+@pytest.fixture
+def cliente():
+    cliente = ClienteSupabaseLocal(max_filas=3)
+    cliente.cargar("alertas_hemoglobina", PACIENTES)
+    return cliente
+
+def dnis(respuesta):
+    return [fila["dni"] for fila in respuesta.data]
+
+def test_filtros_de_comparacion(cliente):
+    tabla = lambda: cliente.table("alertas_hemoglobina").select("dni").order("dni")
+    assert dnis(tabla().eq("region", "LIMA").execute()) == ["1", "4"]
+    assert dnis(tabla().gte("hemoglobina_dl1", 11).execute()) == ["1", "5"]
+    assert dnis(tabla().lt("hemoglobina_dl1", "10").execute()) == ["2", "4"]
+    assert dnis(tabla().eq("en_seguimiento", "true").execute()) == ["2", "4"]
+    assert dnis(tabla().in_("region", ["PUNO", "TACNA"]).execute()) == ["2", "5"]
+
+def test_or_respeta_las_comas_dentro_de_in(cliente):
+    respuesta = (
+        cliente.table("alertas_hemoglobina").select("dni")
+        .or_("region.in.(PUNO,CUSCO),hemoglobina_dl1.lt.7").order("dni").execute()
+    )
+    assert dnis(respuesta) == ["2", "3", "4"]
+
+def test_or_con_columna_inexistente_falla_como_postgrest(cliente):
+    with pytest.raises(ErrorSupabaseLocal):
+        cliente.table("alertas_hemoglobina").select("dni").or_("provincia.eq.LIMA").execute()
+
+def test_orden_rango_y_tope_de_filas(cliente):
+    tabla = lambda: cliente.table("alertas_hemoglobina").select("dni, hemoglobina_dl1")
+    assert dnis(tabla().order("hemoglobina_dl1", desc=True).limit(2).execute()) == ["1", "5"]
+    assert dnis(tabla().order("dni").range(1, 2).execute()) == ["2", "3"]
+    # Como max_rows de PostgREST: nunca más de max_filas por respuesta
+    assert dnis(tabla().order("dni").execute()) == ["1", "2", "3"]
+
+def test_count_exacto_sin_cuerpo(cliente):
+    respuesta = (
+        cliente.table("alertas_hemoglobina").select("*", count="exact", head=True)
+        .eq("en_seguimiento", True).execute()
+    )
+    assert respuesta.count == 2
+    assert respuesta.data == []
+
+def test_upsert_que_ignora_duplicados_devuelve_solo_las_nuevas(cliente):
+    respuesta = cliente.table("alertas_hemoglobina").upsert(
+        [{"dni": "1", "region": "PIURA"}, {"dni": "6", "region": "PIURA"}],
+        on_conflict="dni", ignore_duplicates=True
+    ).execute()
+    assert dnis(respuesta) == ["6"]
+    regiones = cliente.tabla_df("alertas_hemoglobina").set_index("dni")["region"]
+    assert regiones["1"] == "LIMA"
+
+    with pytest.raises(ErrorSupabaseLocal):
+        cliente.table("alertas_hemoglobina").insert({"dni": "2"}).execute()
+
+def test_update_mueve_updated_at(cliente):
+    antes = cliente.tabla_df("alertas_hemoglobina").set_index("dni")["updated_at"]["2"]
+    cliente.table("alertas_hemoglobina").update({"region": "ICA"}).eq("dni", "2").execute()
+    despues = cliente.tabla_df("alertas_hemoglobina").set_index("dni")["updated_at"]["2"]
+    assert despues >= antes
+
+def test_rpc_inyectada():
+    cliente = crear_cliente_local(pacientes=20, funciones_rpc={
+        "contar_pacientes": lambda c, p: [{"total": len(c.tabla_df("alertas_hemoglobina"))}]
+    })
+    assert cliente.rpc("contar_pacientes").execute().data == [{"total": 20}]
+    with pytest.raises(ErrorSupabaseLocal):
+        cliente.rpc("no_existe").execute()
+    assert isinstance(cliente.tabla_df("citas"), pd.DataFrame)
@@ -0,0 +1,35 @@
+import time
+
+CONJUNTOS = [
+    "obtener_cache_compartida", "invalidar_cache_tabla", "VERSIONES_RETENIDAS", "obtener_registro_conjuntos",
+    "generaciones_de", "publicar_conjunto", "obtener_conjunto", "conjunto_vigente",
+]
+
+def cargar(app):
+    espacio = app(CONJUNTOS, time=time, marcar_instantanea_pendiente=lambda *tablas: None)
+    for nombre in ("obtener_cache_compartida", "obtener_registro_conjuntos"):
+        registro = espacio[nombre]()
+        espacio[nombre] = lambda registro=registro: registro
+    return espacio
+
+def test_una_escritura_en_la_tabla_publica_una_version_nueva(app):
+    espacio = cargar(app)
+    construcciones = []
+
+    def construir():
+        construcciones.append(1)
+        return {"pacientes": len(construcciones)}
+
+    vigente = lambda: espacio["conjunto_vigente"]("dashboard", construir, 3600, tablas=["alertas_hemoglobina"])
+    version, valor = vigente()
+    assert vigente() == (version, valor)
+
+    espacio["invalidar_cache_tabla"]("citas")
+    assert vigente() == (version, valor)
+
+    espacio["invalidar_cache_tabla"]("alertas_hemoglobina")
+    nueva, valor_nuevo = vigente()
+    assert nueva != version
+    assert valor_nuevo == {"pacientes": 2}
+    # La versión anterior sigue disponible para quien aún la muestra
+    assert espacio["obtener_conjunto"]("dashboard", version) == valor
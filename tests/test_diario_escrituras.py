@@ -0,0 +1,131 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from test_escritura_por_lotes import ESCRITURA
+
+DIARIO = [
+    "CLAVES_IDEMPOTENCIA", "conectar_diario", "con_clave_idempotencia", "anotar_escritura",
+    "clave_idempotencia_disponible", "enviar_grupo_diario", "vaciar_diario", "guardar_con_respaldo",
+    "contar_escrituras", "escrituras_no_guardadas", "COLUMNAS_OPCIONALES", "INTERVALO_DETECCION_COLUMNAS",
+    "obtener_columnas_detectadas", "columna_disponible", "fila_para_tabla",
+]
+
+class SupabaseConClaves:
+    """
+    Upsert que ignora claves repetidas y solo devuelve las filas nuevas, como PostgREST.
+    Las primeras `cortes` llamadas guardan y luego vencen el tiempo. Un select de una
+    columna fuera de `sin_columnas` responde; las de `sin_columnas` no existen.
+    """
+    def __init__(self, cortes=0, sin_columnas=()):
+        self.guardadas = {}
+        self.insertadas = []
+        self.cortes = cortes
+        self.sin_columnas = set(sin_columnas)
+
+    def table(self, tabla):
+        return self
+
+    def responder(self, guardar):
+        supabase = self
+
+        class Consulta:
+            def limit(self, cantidad):
+                return self
+
+            def execute(self):
+                nuevas = guardar()
+                if supabase.cortes:
+                    supabase.cortes -= 1
+                    raise TimeoutError("The read operation timed out")
+
+                class Respuesta:
+                    data = nuevas
+                return Respuesta()
+        return Consulta()
+
+    def select(self, columna):
+        def probar():
+            if columna in self.sin_columnas:
+                raise Exception(f"column citas.{columna} does not exist")
+            return []
+        return self.responder(probar)
+
+    def upsert(self, filas, on_conflict, ignore_duplicates):
+        def guardar():
+            lote = filas if isinstance(filas, list) else [filas]
+            nuevas = [fila for fila in lote if fila[on_conflict] not in self.guardadas]
+            for fila in nuevas:
+                self.guardadas[fila[on_conflict]] = fila
+            return nuevas
+        return self.responder(guardar)
+
+    def insert(self, filas):
+        def guardar():
+            lote = filas if isinstance(filas, list) else [filas]
+            self.insertadas.extend(lote)
+            return lote
+        return self.responder(guardar)
+
+def cargar(app, supabase, ruta, diferida=False):
+    espacio = app(ESCRITURA + DIARIO, time=time, random=random, supabase=supabase,
+                  invalidar_cache_tabla=lambda *tablas: None, json=json, os=os, sqlite3=sqlite3,
+                  uuid=uuid, datetime=datetime, TABLE_NAME="pacientes", RUTA_DIARIO=str(ruta),
+                  ESCRITURA_DIFERIDA=diferida, TAMANO_LOTE_ESCRITURA=50, refrescar_tras_vaciado=lambda *a: None)
+    disyuntor = espacio["obtener_disyuntor"]()
+    detectadas = espacio["obtener_columnas_detectadas"]()
+    espacio["obtener_disyuntor"] = lambda: disyuntor
+    espacio["obtener_columnas_detectadas"] = lambda: detectadas
+    espacio["iniciar_vaciado_diario"] = lambda: threading.Event()
+    return espacio
+
+def test_cita_que_llego_tras_vencer_el_tiempo_no_se_duplica(app, tmp_path):
+    supabase = SupabaseConClaves()
+    espacio = cargar(app, supabase, tmp_path / "diario.sqlite3")
+    assert espacio["clave_idempotencia_disponible"]("citas")
+
+    supabase.cortes = 99
+    fila, estado = espacio["guardar_con_respaldo"]("citas", {"dni_paciente": "1"})
+    assert estado == "pendiente"
+    assert list(supabase.guardadas) == [fila["id_idempotencia"]]
+
+    supabase.cortes = 0
+    assert espacio["vaciar_diario"]() == 1
+    assert list(supabase.guardadas) == [fila["id_idempotencia"]]
+    assert espacio["contar_escrituras"]() == 0
+    assert espacio["escrituras_no_guardadas"]().empty
+
+def test_sin_migracion_la_cita_se_inserta_sin_clave(app, tmp_path):
+    supabase = SupabaseConClaves(sin_columnas={"id_idempotencia"})
+    espacio = cargar(app, supabase, tmp_path / "diario.sqlite3")
+
+    _, estado = espacio["guardar_con_respaldo"]("citas", {"dni_paciente": "1"})
+    assert estado == "enviado"
+    assert supabase.insertadas == [{"dni_paciente": "1"}]
+    assert supabase.guardadas == {}
+
+def test_dni_repetido_en_modo_diferido_queda_como_duplicado(app, tmp_path):
+    supabase = SupabaseConClaves()
+    supabase.guardadas["123"] = {"dni": "123", "nombre_apellido": "Registrado antes"}
+    espacio = cargar(app, supabase, tmp_path / "diario.sqlite3", diferida=True)
+
+    espacio["anotar_escritura"]("pacientes", {"dni": "123", "nombre_apellido": "Otro paciente"})
+    espacio["anotar_escritura"]("pacientes", {"dni": "456", "nombre_apellido": "Nuevo"})
+    assert espacio["vaciar_diario"]() == 1
+
+    no_guardadas = espacio["escrituras_no_guardadas"]()
+    assert list(no_guardadas["estado"]) == ["duplicado"]
+    assert "123" in no_guardadas["error"].iloc[0]
+    assert supabase.guardadas["123"]["nombre_apellido"] == "Registrado antes"
+    assert espacio["contar_escrituras"]("duplicado") == 1
+
+def test_contar_pendientes_no_crea_el_diario(app, tmp_path):
+    ruta = tmp_path / "diario.sqlite3"
+    espacio = cargar(app, SupabaseConClaves(), ruta)
+    assert espacio["contar_escrituras"]() == 0
+    assert not ruta.exists()
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from test_escritura_por_lotes import cargar
+
+class ConsultaRetenida:
+    """execute() espera a que la prueba la libere y luego responde o vence el tiempo"""
+    def __init__(self, error=None):
+        self.iniciada = threading.Event()
+        self.liberar = threading.Event()
+        self.error = error
+
+    def execute(self):
+        self.iniciada.set()
+        self.liberar.wait(5)
+        if self.error:
+            raise self.error
+        return "ok"
+
+class ConsultaInmediata:
+    def execute(self):
+        return "ok"
+
+def disyuntor_vencido(espacio):
+    disyuntor = espacio["obtener_disyuntor"]()
+    disyuntor.update(fallos=espacio["UMBRAL_DISYUNTOR"], abierto_hasta=time.time() - 1)
+    return disyuntor
+
+@pytest.mark.parametrize("error, cerrado", [(None, True), (TimeoutError("The read operation timed out"), False)])
+def test_semiabierto_deja_pasar_una_sola_prueba(app, error, cerrado):
+    espacio = cargar(app, None)
+    disyuntor = disyuntor_vencido(espacio)
+    prueba = ConsultaRetenida(error)
+    resultado = {}
+
+    def llamar():
+        try:
+            resultado["valor"] = espacio["ejecutar"](prueba)
+        except Exception as e:
+            resultado["error"] = e
+
+    hilo = threading.Thread(target=llamar)
+    hilo.start()
+    assert prueba.iniciada.wait(5)
+
+    with pytest.raises(espacio["DisyuntorAbierto"]):
+        espacio["ejecutar"](ConsultaInmediata())
+
+    prueba.liberar.set()
+    hilo.join(5)
+
+    assert disyuntor["sondeo"] is False
+    if cerrado:
+        assert resultado["valor"] == "ok"
+        assert espacio["ejecutar"](ConsultaInmediata()) == "ok"
+    else:
+        assert isinstance(resultado["error"], TimeoutError)
+        assert disyuntor["abierto_hasta"] > time.time()
+        with pytest.raises(espacio["DisyuntorAbierto"]):
+            espacio["ejecutar"](ConsultaInmediata())
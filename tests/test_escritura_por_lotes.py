@@ -0,0 +1,92 @@
+import random
+import time
+
+import pytest
+
+ESCRITURA = [
+    "TIEMPO_LIMITE_CONSULTA", "MAX_INTENTOS", "ESPERA_BASE", "ESPERA_MAXIMA", "UMBRAL_DISYUNTOR",
+    "ENFRIAMIENTO_DISYUNTOR", "ERRORES_TRANSITORIOS", "ERRORES_SIN_ENVIO", "CODIGOS_API_TRANSITORIOS",
+    "DisyuntorAbierto", "obtener_disyuntor", "es_error_transitorio", "no_se_envio",
+    "admitir_llamada", "registrar_fallo_disyuntor", "ejecutar", "es_fallo_de_conexion", "TAMANO_LOTE_ESCRITURA",
+    "insertar_en_lotes",
+]
+
+class SupabaseEnMemoria:
+    """Guarda las filas insertadas; `fallar(filas)` decide si una llamada falla y cuándo"""
+    def __init__(self, fallar):
+        self.guardadas = []
+        self.fallar = fallar
+
+    def table(self, tabla):
+        return self
+
+    def insert(self, filas):
+        supabase = self
+
+        class Consulta:
+            def execute(self):
+                lote = filas if isinstance(filas, list) else [filas]
+                error, guardar_antes = supabase.fallar(lote)
+                if guardar_antes or error is None:
+                    supabase.guardadas.extend(lote)
+                if error is not None:
+                    raise error
+
+                class Respuesta:
+                    data = lote
+                return Respuesta()
+        return Consulta()
+
+def cargar(app, supabase):
+    espacio = app(ESCRITURA, time=time, random=random, supabase=supabase, invalidar_cache_tabla=lambda *tablas: None)
+    disyuntor = espacio["obtener_disyuntor"]()
+    espacio["obtener_disyuntor"] = lambda: disyuntor
+    return espacio
+
+def test_lote_que_vence_el_tiempo_no_se_reenvia(app):
+    supabase = SupabaseEnMemoria(lambda lote: (TimeoutError("The read operation timed out"), True))
+    citas = [{"dni_paciente": str(i)} for i in range(5)]
+    insertadas, fallos, inciertas = cargar(app, supabase)["insertar_en_lotes"]("citas", citas)
+
+    assert len(supabase.guardadas) == 5
+    assert (insertadas, fallos) == ([], [])
+    assert [fila for fila, _ in inciertas] == citas
+
+def test_lote_rechazado_se_parte_fila_por_fila(app):
+    def fallar(lote):
+        if len(lote) > 1 or lote[0]["dni_paciente"] == "2":
+            return Exception("null value in column \"fecha_cita\" violates not-null constraint"), False
+        return None, False
+
+    supabase = SupabaseEnMemoria(fallar)
+    citas = [{"dni_paciente": str(i)} for i in range(4)]
+    insertadas, fallos, inciertas = cargar(app, supabase)["insertar_en_lotes"]("citas", citas)
+
+    assert [fila["dni_paciente"] for fila in supabase.guardadas] == ["0", "1", "3"]
+    assert len(insertadas) == 3
+    assert [fila["dni_paciente"] for fila, _ in fallos] == ["2"]
+    assert inciertas == []
+
+def test_errores_se_clasifican_por_tipo_y_no_por_texto(app):
+    espacio = cargar(app, None)
+    transitorio, sin_envio = espacio["es_error_transitorio"], espacio["no_se_envio"]
+
+    assert transitorio(TimeoutError("The read operation timed out"))
+    assert transitorio(ConnectionResetError()) and not sin_envio(ConnectionResetError())
+    assert sin_envio(ConnectionRefusedError())
+    assert sin_envio(espacio["DisyuntorAbierto"]())
+    # Un rechazo del servidor que menciona "Connection" o "503" no es un fallo de red
+    rechazo = Exception('duplicate key value violates unique constraint "Connection_503"')
+    assert not transitorio(rechazo) and not sin_envio(rechazo)
+
+def test_errores_de_httpx_y_codigos_de_postgrest(app):
+    httpx = pytest.importorskip("httpx")
+    APIError = pytest.importorskip("postgrest.exceptions").APIError
+    espacio = cargar(app, None)
+    transitorio, sin_envio = espacio["es_error_transitorio"], espacio["no_se_envio"]
+
+    assert transitorio(httpx.ReadTimeout("timed out")) and not sin_envio(httpx.ReadTimeout("timed out"))
+    assert transitorio(httpx.ConnectError("refused")) and sin_envio(httpx.ConnectError("refused"))
+    assert transitorio(APIError({"message": "canceling statement due to statement timeout", "code": "57014"}))
+    assert transitorio(APIError({"message": "JSON could not be generated", "code": "503"}))
+    assert not transitorio(APIError({"message": "duplicate key value", "code": "23505"}))
@@ -0,0 +1,78 @@
+import itertools
+
+import pandas as pd
+
+NUTRICION = [
+    "indice_de", "obtener_referencia_crecimiento", "REFERENCIA_CRECIMIENTO_APROXIMADA",
+    "MEDIDAS_CRECIMIENTO", "SEXOS_CRECIMIENTO", "GENEROS_FEMENINOS",
+    "obtener_registro_indice_crecimiento", "indexar_referencia_crecimiento",
+    "obtener_indice_crecimiento", "evaluar_nutricion_lote", "evaluar_estado_nutricional",
+]
+
+def cargar_nutricion(app):
+    espacio = app(NUTRICION, supabase=None)
+    registro = espacio["obtener_registro_indice_crecimiento"]()
+    espacio["obtener_registro_indice_crecimiento"] = lambda: registro
+    return espacio
+
+def evaluacion_de_referencia(referencia_df, edad_meses, peso_kg, talla_cm, genero):
+    """Búsqueda fila a fila previa al índice (resultado esperado)"""
+    try:
+        edad_entera = int(round(float(edad_meses)))
+        peso_val, talla_val = float(peso_kg), float(talla_cm)
+        ref_edad = referencia_df[referencia_df['edad_meses'] == edad_entera]
+        if ref_edad.empty:
+            return f"Edad {edad_entera}m no encontrada", "N/A", "EDAD FUERA DE RANGO"
+        ref = ref_edad.iloc[0]
+        sexo = "ninas" if str(genero).upper() in ['F', 'FEMENINO', 'NIÑA'] else "ninos"
+        p_min, p_max = ref[f'peso_min_{sexo}'], ref[f'peso_max_{sexo}']
+        t_min, t_max = ref[f'talla_min_{sexo}'], ref[f'talla_max_{sexo}']
+
+        estado_peso = "BAJO PESO" if peso_val < p_min else "SOBREPESO" if peso_val > p_max else "PESO NORMAL"
+        estado_talla = "TALLA BAJA" if talla_val < t_min else "TALLA ALTA" if talla_val > t_max else "TALLA NORMAL"
+        if estado_peso == "BAJO PESO" and estado_talla == "TALLA BAJA":
+            estado_nut = "DESNUTRICIÓN CRÓNICA"
+        elif estado_peso == "BAJO PESO":
+            estado_nut = "DESNUTRICIÓN AGUDA"
+        elif estado_peso == "SOBREPESO" or estado_talla == "TALLA ALTA":
+            estado_nut = "SOBREPESO / RIESGO"
+        else:
+            estado_nut = "NUTRICIÓN ADECUADA"
+        return estado_peso, estado_talla, estado_nut
+    except ValueError:
+        return "Datos inválidos", "Datos inválidos", "ERROR EN FORMULARIO"
+
+def test_evaluacion_individual_igual_a_la_referencia(app):
+    espacio = cargar_nutricion(app)
+    evaluar = espacio["evaluar_estado_nutricional"]
+    referencia_df = espacio["obtener_referencia_crecimiento"]()
+    for edad, peso, talla, genero in itertools.product(
+        [0, 2.6, 6, 15.2, 24, "abc"],
+        [2.0, 7.0, 12.0, 20.0],
+        [45.0, 65.0, 90.0],
+        ["F", "M", "niña"],
+    ):
+        esperado = evaluacion_de_referencia(referencia_df, edad, peso, talla, genero)
+        assert evaluar(edad, peso, talla, genero) == esperado, (edad, peso, talla, genero)
+
+def test_lote_acepta_listas_y_series(app):
+    evaluar_lote = cargar_nutricion(app)["evaluar_nutricion_lote"]
+    desde_listas = evaluar_lote([24, 6], [12.0, 5.0], [88.0, 60.0], ["M", "F"])
+    assert list(desde_listas["estado_nutricional"]) == ["NUTRICIÓN ADECUADA", "DESNUTRICIÓN CRÓNICA"]
+
+    indice = [7, 3]
+    desde_series = evaluar_lote(
+        pd.Series([24, 6], index=indice), pd.Series([12.0, 5.0], index=indice),
+        pd.Series([88.0, 60.0], index=indice), pd.Series(["M", "F"], index=indice)
+    )
+    assert list(desde_series.index) == indice
+    assert list(desde_series["estado_nutricional"]) == list(desde_listas["estado_nutricional"])
+
+def test_indice_de_la_referencia_aproximada_se_construye_una_vez(app):
+    espacio = cargar_nutricion(app)
+    construcciones = []
+    indexar = espacio["indexar_referencia_crecimiento"]
+    espacio["indexar_referencia_crecimiento"] = lambda df: construcciones.append(1) or indexar(df)
+    for _ in range(3):
+        espacio["evaluar_estado_nutricional"](24, 12.0, 88.0, "M")
+    assert len(construcciones) == 1
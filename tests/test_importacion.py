@@ -0,0 +1,64 @@
+import io
+
+IMPORTACION = [
+    "COLUMNAS_IMPORTACION_REQUERIDAS", "COLUMNAS_IMPORTACION_OPCIONALES", "COLUMNAS_REGISTRO_IMPORTACION",
+    "COLUMNAS_RESUMEN_IMPORTACION", "GENEROS_IMPORTACION", "PERU_REGIONS", "GENEROS", "FACTORES_CLINICOS",
+    "FACTORES_SOCIOECONOMICOS", "normalizar_columnas_importacion", "leer_archivo_importacion",
+    "texto_importacion", "numero_importacion", "mascaras_desde_texto", "validar_bloque_importacion",
+    "enviar_bloque_importacion", "importar_pacientes",
+]
+
+ENCABEZADO = "dni,nombre_apellido,edad_meses,peso_kg,talla_cm,genero,telefono,region,hemoglobina_dl1,altitud_msnm\n"
+
+def fila(dni, peso="10", hb="11.5"):
+    return f"{dni},Ana Quispe,24,{peso},85,F,987654321,PUNO,{hb},3800\n"
+
+def cargar(app, insertar, anotadas):
+    espacio = app(
+        IMPORTACION, ALTITUD_REGIONES={}, TAMANO_BLOQUE_IMPORTACION=2, TAMANO_LOTE_ESCRITURA=1,
+        TABLE_NAME="pacientes", insertar_pacientes_en_lote=insertar,
+        es_fallo_de_conexion=lambda error: isinstance(error, TimeoutError),
+        anotar_escritura=lambda tabla, datos: anotadas.append(datos["dni"]),
+    )
+    # Sin Hb ajustada ni puntajes: solo se completan las columnas que se envían
+    columnas = espacio["COLUMNAS_REGISTRO_IMPORTACION"] + espacio["COLUMNAS_RESUMEN_IMPORTACION"]
+    espacio["calcular_bloque_importacion"] = lambda df: df.assign(
+        **{columna: None for columna in columnas if columna not in df.columns}
+    )
+    return espacio
+
+def test_dni_de_fila_rechazada_no_bloquea_la_corregida(app):
+    espacio = cargar(app, None, [])
+    archivo = io.StringIO(ENCABEZADO + fila("12345678", peso="90") + fila("12345678") + fila("12345678"))
+    bloque = next(espacio["leer_archivo_importacion"](archivo, tamano_bloque=10))
+
+    dnis_vistos = set()
+    validos, rechazados = espacio["validar_bloque_importacion"](bloque, dnis_vistos)
+    assert list(validos.index) == [1]
+    assert list(rechazados["motivo"]) == ["Peso fuera de rango (0-50 kg)", "DNI repetido en el archivo"]
+    assert dnis_vistos == {"12345678"}
+
+def test_corte_de_red_a_mitad_de_archivo_no_pierde_filas(app):
+    llamadas, enviados, anotadas = [], [], []
+
+    def insertar(lote, tamano_lote):
+        llamadas.append(lote[0]["dni"])
+        if len(llamadas) == 2:
+            raise TimeoutError("The read operation timed out")
+        if lote[0]["dni"] == "10000003":
+            raise Exception('new row violates check constraint "alertas_hemoglobina_region_check"')
+        enviados.extend(registro["dni"] for registro in lote)
+        return lote, []
+
+    espacio = cargar(app, insertar, anotadas)
+    archivo = io.StringIO(
+        ENCABEZADO + fila("10000001") + fila("bad") + fila("10000002")
+        + fila("10000003") + fila("10000004", hb="50") + fila("10000005")
+    )
+    importados, rechazados = espacio["importar_pacientes"](archivo)
+
+    assert enviados == ["10000001", "10000005"]
+    assert anotadas == ["10000002"]
+    assert list(importados["envio"]) == ["registrado", "pendiente", "registrado"]
+    assert list(rechazados["fila"]) == [3, 5, 6]
+    assert rechazados["motivo"].iloc[1].startswith("Error al guardar")
@@ -0,0 +1,109 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cliente_local import ClienteSupabaseLocal
+
+ANEMIA = [
+    "TABLE_NAME", "RPC_INDICADORES_REGION", "RPC_INDICADORES_REGION_ANTERIORES",
+    "indice_de", "compilar_cortes", "FRANJAS_DECISION_ANEMIA", "ETIQUETAS_FRANJA_EDAD",
+    "DECISION_ANEMIA", "compilar_decision", "CORTES_ANEMIA", "TABLA_ANEMIA", "CODIGOS_CON_ANEMIA",
+    "codigos_anemia", "franja_edad", "decision_anemia", "sql_codigo_anemia", "SQL_INDICADORES_REGION",
+    "COLUMNAS_AGREGADOS", "completar_indicadores", "agregar_indicadores",
+    "agregar_indicadores_por_region", "indicadores_desde_agregados", "obtener_indicadores_agregados",
+]
+
+NIVELES = {0: "SEVERA", 1: "MODERADA", 2: "LEVE", 3: "NORMAL", -1: "SIN DATO"}
+
+# (Hb, edad en meses, código esperado) en los bordes de cada franja
+BORDES = [
+    (6.99, 12, 0), (7.0, 12, 1), (9.95, 12, 1), (10.0, 12, 2), (10.95, 12, 2), (11.0, 12, 3),
+    (6.99, 70, 0), (7.0, 70, 0), (8.0, 70, 1), (9.95, 70, 1), (10.95, 70, 1), (11.0, 70, 2), (11.5, 70, 3),
+    (6.99, 200, 0), (7.0, 200, 0), (8.0, 200, 1), (9.95, 200, 1), (10.95, 200, 1), (11.5, 200, 2), (12.0, 200, 3),
+    (None, 12, -1), (11.0, None, 3),
+]
+
+@pytest.fixture
+def espacio(app):
+    return app(ANEMIA)
+
+@pytest.mark.parametrize("hb, edad, codigo", BORDES)
+def test_codigos_y_decision_en_los_bordes(espacio, hb, edad, codigo):
+    assert int(espacio["codigos_anemia"](hb, edad)) == codigo
+    assert espacio["decision_anemia"](hb, edad)["nivel_anemia"] == NIVELES[codigo]
+
+def test_la_expresion_sql_da_los_mismos_codigos(espacio):
+    # sqlite ya devuelve 0/1 en las comparaciones: se quita el cast de Postgres
+    expresion = espacio["sql_codigo_anemia"]("hb").replace("::int", "")
+    conexion = sqlite3.connect(":memory:")
+    conexion.execute("create table medidas (hb real, edad_meses real)")
+    conexion.executemany("insert into medidas values (?, ?)", [(hb, edad) for hb, edad, _ in BORDES])
+    codigos = [fila[0] for fila in conexion.execute(f"select {expresion} from medidas order by rowid")]
+    assert codigos == [codigo for _, _, codigo in BORDES]
+
+def test_agregados_cuentan_cada_borde_en_su_nivel(espacio):
+    bordes = pd.DataFrame(BORDES, columns=["hemoglobina_dl1", "edad_meses", "codigo"])
+    bordes["region"] = "R" + bordes["edad_meses"].astype(str)
+    agregados = espacio["agregar_indicadores"](bordes).set_index("region")
+    for region, grupo in bordes.groupby("region"):
+        for codigo, columna in enumerate(["severa", "moderada", "leve", "normal"]):
+            assert agregados.loc[region, columna] == (grupo["codigo"] == codigo).sum(), (region, columna)
+
+def indicadores_por_recorrido(datos, decision_anemia):
+    """Un paciente a la vez, región por región (resultado esperado)"""
+    por_region = {}
+    for fila in datos.to_dict("records"):
+        hb = fila["hemoglobina_ajustada"] if pd.notna(fila["hemoglobina_ajustada"]) else fila["hemoglobina_dl1"]
+        nivel = decision_anemia(hb, fila["edad_meses"])["nivel_anemia"]
+        conteo = por_region.setdefault(fila["region"], {
+            "total": 0, "severa": 0, "moderada": 0, "leve": 0, "normal": 0,
+            "en_seguimiento": 0, "anemia_en_seguimiento": 0, "suma_hb": 0.0, "n_hb": 0
+        })
+        conteo["total"] += 1
+        if nivel != "SIN DATO":
+            conteo[nivel.lower()] += 1
+            conteo["suma_hb"] += hb
+            conteo["n_hb"] += 1
+        if fila["en_seguimiento"]:
+            conteo["en_seguimiento"] += 1
+            conteo["anemia_en_seguimiento"] += nivel in ("SEVERA", "MODERADA", "LEVE")
+    return por_region
+
+def test_groupby_igual_al_recorrido_fila_a_fila(espacio):
+    generador = np.random.default_rng(7)
+    n = 2000
+    datos = pd.DataFrame({
+        "region": generador.choice(["LIMA", "PUNO", "CUSCO", None], n),
+        "hemoglobina_dl1": np.round(generador.uniform(5, 14, n), 2),
+        "hemoglobina_ajustada": np.where(generador.random(n) < 0.3, np.nan, np.round(generador.uniform(5, 14, n), 2)),
+        "edad_meses": generador.integers(0, 220, n),
+        "en_seguimiento": generador.random(n) < 0.4,
+    })
+    datos.loc[generador.random(n) < 0.05, "hemoglobina_dl1"] = np.nan
+
+    esperado = indicadores_por_recorrido(datos, espacio["decision_anemia"])
+    obtenido = {fila.pop("region"): fila for fila in espacio["agregar_indicadores_por_region"](datos)}
+    assert obtenido.keys() == esperado.keys()
+    for region, conteo in esperado.items():
+        for columna, valor in conteo.items():
+            assert obtenido[region][columna] == pytest.approx(valor), (region, columna)
+
+def test_rpc_de_version_anterior_cae_a_pandas(app):
+    cliente = ClienteSupabaseLocal(funciones_rpc={
+        "indicadores_anemia_por_region": lambda c, p: [{"region": "LIMA", "total": 999}]
+    })
+    cliente.cargar("alertas_hemoglobina", [
+        {"dni": "1", "region": "LIMA", "hemoglobina_dl1": 9.0, "edad_meses": 12, "en_seguimiento": True}
+    ])
+    espacio = app(
+        ANEMIA, supabase=cliente, ejecutar=lambda consulta: consulta.execute(),
+        leer_con_cache=lambda tabla, consulta, cargar: cargar(),
+        obtener_datos_por_uso=lambda uso: cliente.tabla_df("alertas_hemoglobina")
+    )
+    assert "indicadores_anemia_por_region()" in espacio["SQL_INDICADORES_REGION"]
+
+    indicadores, _, origen = espacio["obtener_indicadores_agregados"]()
+    assert origen == "pandas"
+    assert indicadores["total_pacientes"] == 1 and indicadores["moderada"] == 1
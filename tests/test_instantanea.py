@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pandas as pd
+
+INSTANTANEA = [
+    "TABLE_NAME", "COLUMNAS_POR_USO", "COLUMNAS_OPCIONALES", "INTERVALO_DETECCION_COLUMNAS",
+    "obtener_columnas_detectadas", "columna_disponible", "columnas_disponibles",
+    "TAMANO_PAGINA", "ORDEN_PAGINACION", "aplicar_filtros", "leer_tabla_paginada", "compactar_tipos",
+    "combinar_paginas", "MARCAS_AGUA", "MARGEN_MARCA_AGUA", "INTERVALO_SINCRONIZACION",
+    "INTERVALO_RECARGA_COMPLETA", "obtener_instantaneas", "lock_instantanea", "columnas_instantanea",
+    "fusionar_filas", "ultima_marca", "desde_marca", "total_en_servidor", "sincronizar_instantanea",
+    "marcar_instantanea_pendiente",
+]
+
+class CitasEnServidor:
+    """Tabla de citas con updated_at puesto por el servidor; registra los filtros gte pedidos"""
+    def __init__(self, filas):
+        self.filas = filas
+        self.desde = []
+
+    def table(self, tabla):
+        return Consulta(self, list(self.filas))
+
+class Consulta:
+    def __init__(self, servidor, filas, columnas="*", cabecera=False):
+        self.servidor, self.filas, self.columnas, self.cabecera = servidor, filas, columnas, cabecera
+
+    def select(self, columnas, count=None, head=False):
+        return Consulta(self.servidor, self.filas, columnas, head)
+
+    def gte(self, columna, valor):
+        self.servidor.desde.append(valor)
+        return Consulta(self.servidor, [f for f in self.filas if f[columna] >= valor], self.columnas)
+
+    def gt(self, columna, valor):
+        return Consulta(self.servidor, [f for f in self.filas if f[columna] > valor], self.columnas)
+
+    def order(self, columna):
+        return Consulta(self.servidor, sorted(self.filas, key=lambda f: f[columna]), self.columnas)
+
+    def limit(self, cantidad):
+        return Consulta(self.servidor, self.filas[:cantidad], self.columnas)
+
+    def execute(self):
+        consulta = self
+
+        class Respuesta:
+            count = len(consulta.filas)
+            data = [] if consulta.cabecera else [
+                {c: f.get(c) for c in consulta.columnas.split(", ")} for f in consulta.filas
+            ]
+        return Respuesta()
+
+def cita(id_cita, dni, marca):
+    return {"id": id_cita, "dni_paciente": dni, "updated_at": marca}
+
+def cargar(app, servidor):
+    espacio = app(INSTANTANEA, TABLE_NAME="alertas_hemoglobina", supabase=servidor, time=time,
+                  threading=threading, ejecutar=lambda consulta: consulta.execute(),
+                  es_fallo_de_conexion=lambda e: False, avisar_datos_obsoletos=lambda *a: None)
+    for nombre in ("obtener_instantaneas", "obtener_columnas_detectadas"):
+        registro = espacio[nombre]()
+        espacio[nombre] = lambda registro=registro: registro
+    espacio["COLUMNAS_POR_USO"] = {"citas_futuras": ("citas", ["dni_paciente"])}
+    return espacio
+
+def test_sincronizacion_usa_la_marca_del_servidor_y_ve_borrados(app):
+    servidor = CitasEnServidor([cita(1, "1", "2026-10-18T10:00:00"), cita(2, "2", "2026-10-18T10:05:00")])
+    espacio = cargar(app, servidor)
+    sincronizar = espacio["sincronizar_instantanea"]
+    assert sorted(sincronizar("citas")["id"]) == [1, 2]
+
+    # Cambio hecho por otro proceso: el servidor le pone una marca nueva
+    servidor.filas[0] = cita(1, "9", "2026-10-18T10:06:00")
+    servidor.filas.append(cita(3, "3", "2026-10-18T10:06:00"))
+    espacio["marcar_instantanea_pendiente"]("citas")
+    df = sincronizar("citas")
+    assert set(servidor.desde) == {"2026-10-18T10:04:00"}
+    assert dict(zip(df["id"], df["dni_paciente"].astype(str))) == {1: "9", 2: "2", 3: "3"}
+
+    # Un borrado no mueve la marca: el total distinto obliga a recargar
+    del servidor.filas[1]
+    espacio["marcar_instantanea_pendiente"]("citas")
+    assert sorted(sincronizar("citas")["id"]) == [1, 3]
+
+def test_fusionar_conserva_las_categorias_sin_recompactar(app):
+    espacio = app(INSTANTANEA, TABLE_NAME="alertas_hemoglobina")
+    df = pd.DataFrame({"id": [1, 2, 3, 4], "region": pd.Categorical(["LIMA", "LIMA", "PUNO", "PUNO"])})
+    nuevas = pd.DataFrame({"id": [4, 5], "region": ["CUSCO", "LIMA"]})
+
+    fusion = espacio["fusionar_filas"](df, nuevas, "id")
+    assert isinstance(fusion["region"].dtype, pd.CategoricalDtype)
+    assert dict(zip(fusion["id"], fusion["region"])) == {1: "LIMA", 2: "LIMA", 3: "PUNO", 4: "CUSCO", 5: "LIMA"}
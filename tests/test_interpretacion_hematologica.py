@@ -0,0 +1,112 @@
+import itertools
+
+HEMATOLOGIA = [
+    "indice_de", "SEVERIDADES_HEMATOLOGIA", "MORFOLOGIAS_HEMATOLOGIA", "PRODUCCIONES_HEMATOLOGIA",
+    "TEXTOS_SEVERIDAD_HEMATOLOGIA", "TEXTOS_MORFOLOGIA_HEMATOLOGIA", "TEXTOS_PRODUCCION_HEMATOLOGIA",
+    "DESCARTES_HEMATOLOGIA", "interpretar_hematologia_lote", "renderizar_interpretacion",
+    "interpretar_analisis_hematologico", "COLUMNAS_PANEL_HEMATOLOGIA", "numero_importacion",
+]
+
+def interpretacion_de_referencia(ferritina, chcm, reticulocitos, transferrina, hemoglobina_ajustada, edad_meses, pcr):
+    """Reglas en cascada previas a la versión por lotes (resultado esperado)"""
+    interpretacion = ""
+    descarte_clinico = []
+
+    if ferritina < 15 and pcr <= 0.5:
+        interpretacion += "🚨 **DEFICIENCIA REAL DE HIERRO**. "
+        severidad = "CRITICO"
+        descarte_clinico.append("✅ **Anemia Inflamatoria descartada**: PCR normal confirma déficit de hierro real.")
+    elif ferritina < 30:
+        interpretacion += "⚠️ **RESERVAS BAJAS DE HIERRO**. "
+        severidad = "MODERADO"
+    else:
+        interpretacion += "✅ **RESERVAS DE HIERRO NORMALES**. "
+        severidad = "NORMAL"
+        if pcr > 0.5:
+            descarte_clinico.append("🦠 **Ojo**: PCR elevada. La ferritina podría estar falsamente normal.")
+
+    if chcm < 32:
+        interpretacion += "📉 **HIPOCROMÍA**. "
+        descarte_clinico.append("✅ **Anemia Megaloblástica descartada**: CHCM bajo sugiere falta de hierro, no de B12.")
+    elif chcm >= 32 and chcm <= 36:
+        interpretacion += "✅ **NORMOCROMÍA**. "
+
+    if reticulocitos > 1.5:
+        interpretacion += "🔄 **MÉDULA HIPERACTIVA**. "
+        descarte_clinico.append("⚠️ **Anemia Hemolítica**: Considerar esta opción por reticulocitos altos.")
+    else:
+        interpretacion += "🟡 **PRODUCCIÓN MEDULAR NO COMPENSATORIA**. "
+        descarte_clinico.append("✅ **Anemia Hemolítica descartada**: Reticulocitos normales indican falta de materia prima.")
+
+    if severidad == "CRITICO":
+        recomendacion = "🚨 **INTERVENCIÓN INMEDIATA**: Hierro elemental 3-6 mg/kg/día + Control en 15 días."
+        codigo_color = "#DC2626"
+    elif severidad == "MODERADO":
+        recomendacion = "⚠️ **ACCIÓN PRIORITARIA**: Suplementación con hierro + Educación nutricional."
+        codigo_color = "#D97706"
+    else:
+        recomendacion = "✅ **SEGUIMIENTO**: Alimentación balanceada y control preventivo."
+        codigo_color = "#16A34A"
+
+    return {
+        "interpretacion": interpretacion,
+        "severidad": severidad,
+        "recomendacion": recomendacion,
+        "codigo_color": codigo_color,
+        "descartes": descarte_clinico
+    }
+
+def test_interpretacion_individual_igual_a_la_referencia(app):
+    interpretar = app(HEMATOLOGIA)["interpretar_analisis_hematologico"]
+    for ferritina, chcm, reticulocitos, pcr in itertools.product(
+        [5.0, 14.9, 15.0, 29.9, 30.0, 80.0],
+        [28.0, 31.9, 32.0, 36.0, 36.1],
+        [0.5, 1.5, 1.6],
+        [0.1, 0.5, 0.6],
+    ):
+        argumentos = (ferritina, chcm, reticulocitos, 250.0, 10.5, 24, pcr)
+        assert interpretar(*argumentos) == interpretacion_de_referencia(*argumentos), argumentos
+
+def test_lote_conserva_el_indice_de_series(app):
+    espacio = app(HEMATOLOGIA)
+    pd = espacio["pd"]
+    indice = [10, 20]
+    codigos = espacio["interpretar_hematologia_lote"](
+        pd.Series([10.0, 50.0], index=indice), pd.Series([30.0, 34.0], index=indice),
+        pd.Series([1.0, 2.0], index=indice), pd.Series([250.0, 250.0], index=indice),
+        pd.Series([0.1, 0.9], index=indice)
+    )
+    assert list(codigos.index) == indice
+    assert list(codigos["cod_severidad"]) == [0, 2]
+
+def test_celdas_vacias_dan_sin_dato_y_no_descartan(app):
+    espacio = app(HEMATOLOGIA)
+    nan = float("nan")
+    codigos = espacio["interpretar_hematologia_lote"](
+        [nan, 10.0, 10.0, 50.0], [nan, 30.0, nan, 34.0], [nan, nan, 1.0, nan],
+        [nan, nan, nan, nan], [nan, nan, nan, 0.9]
+    )
+    severidades = [espacio["SEVERIDADES_HEMATOLOGIA"][c] for c in codigos["cod_severidad"]]
+    morfologias = [espacio["MORFOLOGIAS_HEMATOLOGIA"][c] for c in codigos["cod_morfologia"]]
+    producciones = [espacio["PRODUCCIONES_HEMATOLOGIA"][c] for c in codigos["cod_produccion"]]
+
+    assert severidades == ["SIN DATO", "CRITICO", "CRITICO", "NORMAL"]
+    assert morfologias == ["SIN DATO", "HIPOCROMIA", "SIN DATO", "NORMOCROMIA"]
+    assert producciones == ["SIN DATO", "SIN DATO", "NO COMPENSATORIA", "SIN DATO"]
+
+    textos = [espacio["renderizar_interpretacion"](fila)["descartes"] for _, fila in codigos.iterrows()]
+    assert textos[0] == []
+    # Sin PCR no se afirma que la PCR sea normal; sin reticulocitos no se descarta hemólisis
+    assert not any("Inflamatoria" in t or "Hemolítica descartada" in t for t in textos[1])
+    assert any("Hemolítica descartada" in t for t in textos[2])
+    assert any("PCR elevada" in t for t in textos[3])
+
+def test_fila_en_blanco_del_panel_del_dia(app):
+    espacio = app(HEMATOLOGIA)
+    panel = espacio["pd"].DataFrame([{c: "" for c in espacio["COLUMNAS_PANEL_HEMATOLOGIA"]}], dtype=object)
+    codigos = espacio["interpretar_hematologia_lote"](
+        *(espacio["numero_importacion"](panel[c]) for c in espacio["COLUMNAS_PANEL_HEMATOLOGIA"])
+    )
+    detalle = espacio["renderizar_interpretacion"](codigos.iloc[0])
+    assert detalle["severidad"] == "SIN DATO"
+    assert detalle["descartes"] == []
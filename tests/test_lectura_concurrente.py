@@ -0,0 +1,33 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+CONCURRENCIA = ["en_segundo_plano", "leer_en_paralelo"]
+
+def cargar(app):
+    ejecutor = ThreadPoolExecutor(max_workers=1)
+    espacio = app(
+        CONCURRENCIA, get_script_run_ctx=lambda: "sesion_a",
+        add_script_run_ctx=lambda hilo, contexto: setattr(hilo, "contexto_sesion", contexto)
+    )
+    espacio["obtener_ejecutor_consultas"] = lambda: ejecutor
+    return espacio, ejecutor
+
+def contexto_del_hilo():
+    return getattr(threading.current_thread(), "contexto_sesion", None)
+
+def test_el_hilo_vuelve_al_pool_sin_la_sesion(app):
+    espacio, ejecutor = cargar(app)
+    assert espacio["leer_en_paralelo"](durante=contexto_del_hilo) == {"durante": "sesion_a"}
+    assert ejecutor.submit(contexto_del_hilo).result() is None
+
+def test_la_sesion_se_suelta_aunque_la_lectura_falle(app):
+    espacio, ejecutor = cargar(app)
+
+    def fallar():
+        raise ConnectionError("sin red")
+
+    with pytest.raises(ConnectionError):
+        espacio["en_segundo_plano"](fallar).result()
+    assert ejecutor.submit(contexto_del_hilo).result() is None
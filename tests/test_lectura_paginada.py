@@ -0,0 +1,47 @@
+import pytest
+
+PAGINACION = ["TABLE_NAME", "TAMANO_PAGINA", "ORDEN_PAGINACION", "aplicar_filtros", "leer_tabla_paginada"]
+
+class TablaConTope:
+    """Como PostgREST con max_rows: ninguna respuesta trae más de `tope` filas"""
+    def __init__(self, filas, tope):
+        self.filas = filas
+        self.tope = tope
+
+    def table(self, tabla):
+        return Consulta(self, list(self.filas))
+
+class Consulta:
+    def __init__(self, origen, filas):
+        self.origen = origen
+        self.filas = filas
+
+    def select(self, columnas):
+        return self
+
+    def order(self, columna):
+        return Consulta(self.origen, sorted(self.filas, key=lambda fila: fila[columna]))
+
+    def gt(self, columna, valor):
+        return Consulta(self.origen, [fila for fila in self.filas if fila[columna] > valor])
+
+    def limit(self, cantidad):
+        return Consulta(self.origen, self.filas[:cantidad])
+
+    def range(self, inicio, fin):
+        return Consulta(self.origen, self.filas[inicio:fin + 1])
+
+    def execute(self):
+        class Respuesta:
+            data = self.filas[:self.origen.tope]
+        return Respuesta()
+
+@pytest.mark.parametrize("clave", [None, "dni"])
+def test_max_rows_menor_que_la_pagina_no_corta_la_lectura(app, clave):
+    filas = [{"dni": f"{i:08d}"} for i in range(25)]
+    espacio = app(PAGINACION, supabase=TablaConTope(filas, tope=10), ejecutar=lambda consulta: consulta.execute())
+
+    paginas = list(espacio["leer_tabla_paginada"]("pacientes", tamano_pagina=20, clave=clave))
+
+    assert [len(pagina) for pagina in paginas] == [10, 10, 5]
+    assert [dni for pagina in paginas for dni in pagina["dni"]] == [fila["dni"] for fila in filas]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from test_evaluacion_nutricional import NUTRICION
+
+PUNTAJES_Z = NUTRICION + [
+    "REFERENCIA_LMS_APROXIMADA", "REFERENCIA_LMS_APROXIMADA_DF", "INDICADORES_PESO",
+    "obtener_referencia_lms", "obtener_registro_indice_lms", "indexar_lms", "obtener_indice_lms",
+    "puntaje_z_lms", "evaluar_nutricion_zscore", "referencia_lms_aproximada",
+]
+
+# Tablas OMS 2006 publicadas (redondeadas a un decimal): -2 DE, mediana, +2 DE
+PUNTOS_OMS = [
+    ("peso_edad", "M", 12, (7.7, 9.6, 12.0)),
+    ("peso_edad", "F", 12, (7.0, 8.9, 11.5)),
+    ("talla_edad", "M", 12, (71.0, 75.7, 80.5)),
+    ("talla_edad", "F", 12, (68.9, 74.0, 79.2)),
+    ("peso_talla", "M", 45, (2.0, 2.4, 3.0)),
+    ("peso_talla", "F", 45, (2.1, 2.5, 3.0)),
+]
+
+def cargar_puntajes_z(app):
+    espacio = app(PUNTAJES_Z, supabase=None)
+    for nombre in ["obtener_registro_indice_crecimiento", "obtener_registro_indice_lms"]:
+        registro = espacio[nombre]()
+        espacio[nombre] = lambda registro=registro: registro
+    return espacio
+
+def test_la_mediana_da_z_cero_en_cada_anclaje(app):
+    espacio = cargar_puntajes_z(app)
+    for (indicador, sexo), filas in espacio["REFERENCIA_LMS_APROXIMADA"].items():
+        x, _, m, _ = (np.array(columna) for columna in zip(*filas))
+        z = espacio["puntaje_z_lms"](indicador, m, x, np.full(len(x), sexo == "F"))
+        assert np.allclose(z, 0, atol=1e-9), (indicador, sexo)
+
+@pytest.mark.parametrize("indicador, sexo, x, publicados", PUNTOS_OMS)
+def test_puntos_publicados_de_la_oms(app, indicador, sexo, x, publicados):
+    puntaje_z = cargar_puntajes_z(app)["puntaje_z_lms"]
+    for k, valor in zip([-2, 0, 2], publicados):
+        # El valor publicado es el de la tabla redondeado: k DE cae dentro de ±0.05
+        bajo, alto = puntaje_z(indicador, [valor - 0.05, valor + 0.05], [x, x], np.array([sexo == "F"] * 2))
+        assert bajo <= k <= alto, (indicador, sexo, k, valor)
+
+def test_falta_un_puntaje_z_y_los_otros_estados_se_mantienen(app):
+    espacio = cargar_puntajes_z(app)
+    resultado = espacio["evaluar_nutricion_zscore"]([12, 12], [None, 9.6], [75.7, 65.0], ["M", "M"])
+
+    sin_peso = resultado.iloc[0]
+    assert np.isnan(sin_peso["z_peso_edad"]) and np.isnan(sin_peso["z_peso_talla"])
+    assert sin_peso["estado_talla"] == "TALLA NORMAL"
+    assert sin_peso["estado_peso"] == "Datos inválidos"
+    assert sin_peso["estado_nutricional"] == "ERROR EN FORMULARIO"
+
+    talla_baja = resultado.iloc[1]
+    assert talla_baja["estado_peso"] == "PESO NORMAL"
+    assert talla_baja["estado_talla"] == "TALLA BAJA SEVERA"
+
+def test_sin_tabla_en_la_base_se_avisa_la_aproximacion(app):
+    espacio = cargar_puntajes_z(app)
+    assert espacio["referencia_lms_aproximada"]()
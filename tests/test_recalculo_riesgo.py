@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pandas as pd
+
+RIESGO = [
+    "indice_de", "compilar_cortes", "FRANJAS_DECISION_ANEMIA", "DECISION_ANEMIA", "compilar_decision",
+    "CORTES_ANEMIA", "TABLA_ANEMIA", "codigos_anemia", "decision_anemia",
+    "FACTORES_CLINICOS", "FACTORES_SOCIOECONOMICOS", "PUNTOS_FACTOR_CLINICO", "PUNTOS_FACTOR_SOCIAL",
+    "UMBRALES_RIESGO", "RIESGO_BASE", "mascara_factores", "contar_factores", "mascaras_desde_texto",
+    "calcular_riesgo_anemia", "calcular_riesgo_lote", "recalcular_riesgo_cohorte",
+    "AJUSTE_HEMOGLOBINA", "indexar_ajustes", "INDICE_AJUSTE", "ajustes_por_altitud", "ajustar_hemoglobina_lote",
+]
+
+def test_recalculo_conserva_el_riesgo_del_formulario(app):
+    espacio = app(RIESGO, TABLE_NAME="alertas_hemoglobina")
+    clinicos, sociales = espacio["FACTORES_CLINICOS"], espacio["FACTORES_SOCIOECONOMICOS"]
+    casos = [
+        ("1", 11.5, 24, [], []),
+        ("2", 9.5, 24, clinicos[:1], sociales[:2]),
+        ("3", 6.5, 30, clinicos[:2], sociales[:1]),
+        ("4", 10.5, 100, [], sociales),
+    ]
+    filas = []
+    for dni, hb, edad, elegidos_clinicos, elegidos_sociales in casos:
+        nivel, _, estado = espacio["calcular_riesgo_anemia"](hb, edad, elegidos_clinicos, elegidos_sociales)
+        filas.append({
+            "dni": dni, "edad_meses": edad, "hemoglobina_dl1": hb, "hemoglobina_ajustada": hb,
+            "altitud_msnm": 0, "riesgo": nivel, "estado_alerta": estado,
+            "mascara_factores_clinicos": espacio["mascara_factores"](elegidos_clinicos, clinicos),
+            "mascara_factores_sociales": espacio["mascara_factores"](elegidos_sociales, sociales),
+        })
+    # Registro antiguo sin máscaras: no se vuelve a puntuar
+    filas.append({**filas[0], "dni": "5", "riesgo": "ALTO RIESGO",
+                  "mascara_factores_clinicos": None, "mascara_factores_sociales": None})
+
+    cambios, omitidos = espacio["recalcular_riesgo_cohorte"](pd.DataFrame(filas))
+    assert cambios.empty
+    assert omitidos == 1
+
+def test_mascaras_desde_texto_de_la_planilla(app):
+    espacio = app(RIESGO, TABLE_NAME="alertas_hemoglobina")
+    clinicos = espacio["FACTORES_CLINICOS"]
+    texto = pd.Series([
+        "", f"{clinicos[0]}; {clinicos[2].upper()}", f"{clinicos[1]};{clinicos[1]}", "Factor inventado"
+    ], index=[4, 5, 6, 7])
+    mascara, desconocido = espacio["mascaras_desde_texto"](texto, clinicos)
+    assert list(mascara) == [0, 0b101, 0b10, 0]
+    assert list(desconocido) == [False, False, False, True]
+    assert list(espacio["contar_factores"](mascara, clinicos)) == [0, 2, 1, 0]
+
+class BaseSinMascaras:
+    """select de una columna inexistente falla como PostgREST (42703); cuenta las pruebas"""
+    def __init__(self):
+        self.pruebas = 0
+
+    def table(self, tabla):
+        return self
+
+    def select(self, columnas):
+        self.pruebas += 1
+        self.columnas = columnas
+        return self
+
+    def limit(self, cantidad):
+        return self
+
+    def execute(self):
+        if self.columnas.startswith("mascara_"):
+            raise Exception(f"column alertas_hemoglobina.{self.columnas} does not exist")
+
+def test_sin_migracion_no_se_piden_ni_envian_las_mascaras(app):
+    supabase = BaseSinMascaras()
+    espacio = app(
+        ["COLUMNAS_POR_USO", "COLUMNAS_OPCIONALES", "INTERVALO_DETECCION_COLUMNAS", "obtener_columnas_detectadas",
+         "columna_disponible", "columnas_disponibles", "fila_para_tabla", "columnas_de_uso"],
+        TABLE_NAME="alertas_hemoglobina", supabase=supabase, time=time, threading=threading,
+        ejecutar=lambda consulta: consulta.execute(), es_fallo_de_conexion=lambda e: False,
+    )
+    detectadas = espacio["obtener_columnas_detectadas"]()
+    espacio["obtener_columnas_detectadas"] = lambda: detectadas
+
+    assert "mascara" not in espacio["columnas_de_uso"]("recalculo_riesgo")
+    fila = espacio["fila_para_tabla"]("alertas_hemoglobina", {"dni": "1", "mascara_factores_clinicos": 3})
+    assert fila == {"dni": "1"}
+    espacio["columnas_de_uso"]("recalculo_riesgo")
+    assert supabase.pruebas == 2